@@ -2,13 +2,20 @@
 Base class for Connect-M
 """
 from abc import ABC, abstractmethod
-from enum import Enum
-from typing import Optional
+from enum import IntEnum
+from typing import Iterator, Optional
 
-PieceColor = Enum("PieceColor", ["RED", "YELLOW"])
-"""
-Enum type for representing piece colors.
-"""
+
+class PieceColor(IntEnum):
+    """
+    Enum type for representing piece colors.
+
+    The values are 0 and 1, so a color can be used directly
+    as an index (e.g., into a list with one entry per color),
+    and the other color is 1 - color.
+    """
+    RED = 0
+    YELLOW = 1
 
 
 class ConnectMBase(ABC):
@@ -16,6 +23,8 @@ class ConnectMBase(ABC):
     Class for representing a Connect-M board
     """
 
+    __slots__ = ("_nrows", "_ncols", "_m")
+
     #
     # PRIVATE ATTRIBUTES
     #
@@ -78,6 +87,10 @@ class ConnectMBase(ABC):
         """ Checks whether dropping a piece in this
         column will result in a win.
 
+        This does not modify the board (the bots call this
+        method for every column in every turn, so it should
+        not have to drop a piece and then undo the drop).
+
         Args:
             col: Column index
             color: Color of the piece to drop
@@ -93,6 +106,25 @@ class ConnectMBase(ABC):
         """
         raise NotImplementedError
 
+    def winning_cols(self, color: PieceColor) -> list[int]:
+        """ Returns the columns where dropping a piece
+        would result in a win.
+
+        Subclasses can override this with a faster
+        implementation than checking every column
+        with drop_wins.
+
+        Args:
+            color: Color of the piece to drop
+
+        Returns:
+            list[int]: The indices of the (non-full) columns where
+            dropping a piece of the given color would result in
+            a win, in increasing order.
+
+        """
+        return [col for col in self.legal_cols if self.drop_wins(col, color)]
+
     @abstractmethod
     def drop(self, col: int, color: PieceColor) -> None:
         """ Drops a piece in a column
@@ -109,10 +141,10 @@ class ConnectMBase(ABC):
 
         """
 
-        # After dropping the piece, we would use _winner_at
-        # to check whether adding that piece results in a
-        # winning row/column/diagonal. If there is a winner
-        # we update the _winner attribute.
+        # After dropping the piece, we would check whether
+        # adding that piece results in a winning row/column/
+        # diagonal. If there is a winner we update the
+        # _winner attribute.
         raise NotImplementedError
 
     @abstractmethod
@@ -157,6 +189,20 @@ class ConnectMBase(ABC):
         # of the board)
         raise NotImplementedError
 
+    @property
+    def legal_cols(self) -> list[int]:
+        """ Returns the columns a piece can be dropped into
+
+        Subclasses can override this to return a list they keep
+        up to date as pieces are dropped. Callers should not
+        modify the returned list.
+
+        Returns:
+            list[int]: The indices of the columns that are not full,
+            in increasing order.
+        """
+        return [col for col in range(self._ncols) if self.can_drop(col)]
+
     @property
     def num_cols(self) -> int:
         """ Returns the number of columns in the board"""
@@ -185,3 +231,20 @@ class ConnectMBase(ABC):
             (red piece), or PieceColor.YELLOW (yellow piece)
         """
         raise NotImplementedError
+
+    def iter_cells(self) -> Iterator[tuple[int, int, Optional[PieceColor]]]:
+        """ Iterates over the cells of the board
+
+        The cells are produced in the same order, and with the same
+        row and column numbers, as in the grid property. Subclasses
+        can override this to read the cells without building the
+        whole grid.
+
+        Returns:
+            Iterator[tuple[int, int, Optional[PieceColor]]]: The row,
+            column, and value (None, PieceColor.RED, or
+            PieceColor.YELLOW) of each cell
+        """
+        for i, row in enumerate(self.grid):
+            for j, piece_color in enumerate(row):
+                yield i, j, piece_color
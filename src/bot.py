@@ -3,7 +3,10 @@ Bots for Connect-M
 
 (and command for running simulations with bots)
 """
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
 
 import click
 
@@ -20,22 +23,29 @@ class RandomBot:
     Simple Bot that just picks a move at random
     """
 
+    __slots__ = ("_connectm", "_color", "_opponent_color", "_rng")
+
     _connectm: ConnectMBase
     _color: PieceColor
     _opponent_color: PieceColor
+    _rng: random.Random
 
     def __init__(self, connectm: ConnectMBase, color: PieceColor,
-                 opponent_color: PieceColor):
+                 opponent_color: PieceColor,
+                 rng: Optional[random.Random] = None):
         """ Constructor
 
         Args:
             connectm: The Connect-M board
             color: Bot's color
             opponent_color: Opponent's color
+            rng: Random number generator to use (if not provided,
+              the bot creates its own)
         """
         self._connectm = connectm
         self._color = color
         self._opponent_color = opponent_color
+        self._rng = rng if rng is not None else random.Random()
 
     def suggest_move(self) -> int:
         """ Suggests a move
@@ -43,12 +53,8 @@ class RandomBot:
         Returns: None
 
         """
-        possible_cols = []
-        for col in range(self._connectm.num_cols):
-            if self._connectm.can_drop(col):
-                possible_cols.append(col)
-
-        return random.choice(possible_cols)
+        cols = self._connectm.legal_cols
+        return cols[self._rng.randrange(len(cols))]
 
 
 class SmartBot:
@@ -61,23 +67,30 @@ class SmartBot:
     - Otherwise, pick a column at random.
     """
 
+    __slots__ = ("_connectm", "_color", "_opponent_color", "_rng")
+
     _connectm: ConnectMBase
     _color: PieceColor
     _opponent_color: PieceColor
+    _rng: random.Random
 
     def __init__(self, connectm: ConnectMBase, color: PieceColor,
-                 opponent_color: PieceColor):
+                 opponent_color: PieceColor,
+                 rng: Optional[random.Random] = None):
         """ Constructor
 
         Args:
             connectm: The Connect-M board the bot will play in
             color: Bot's color
             opponent_color: Opponent's color
+            rng: Random number generator to use (if not provided,
+              the bot creates its own)
         """
 
         self._connectm = connectm
         self._color = color
         self._opponent_color = opponent_color
+        self._rng = rng if rng is not None else random.Random()
 
     def suggest_move(self) -> int:
         """ Suggests a move
@@ -86,42 +99,25 @@ class SmartBot:
 
         """
 
-        opponent_win_moves = []
-        nonwinning_moves = []
-
-        for col in range(self._connectm.num_cols):
-            if not self._connectm.can_drop(col):
-                continue
-
-            if self._connectm.drop_wins(col, self._color):
-                # If dropping a piece in this column
-                # wins us the game, then we make that
-                # move
-                return col
-            elif self._connectm.drop_wins(col, self._opponent_color):
-                # If our opponent would win the game
-                # if they dropped a piece in this column,
-                # we save that column. We don't immediately
-                # suggest it because there could still be
-                # a column that wins us the game, and we
-                # would preference that over blocking out
-                # opponent
-                opponent_win_moves.append(col)
-            else:
-                # Otherwise, we mark this as a non-winning move
-                nonwinning_moves.append(col)
+        winning_moves = self._connectm.winning_cols(self._color)
+        if len(winning_moves) > 0:
+            # If dropping a piece in a column wins
+            # us the game, then we make that move
+            return winning_moves[0]
 
+        opponent_win_moves = self._connectm.winning_cols(self._opponent_color)
         if len(opponent_win_moves) > 0:
             # If there is a column where our opponent would win
             # the game in the next move, we block that move.
             return opponent_win_moves[0]
         else:
-            # Otherwise, we just choose between the non-winning
+            # Otherwise, we just choose between the (non-winning)
             # moves at random. We would have to apply further
             # heuristics (or explore the game tree) to decide
             # which of these moves actually increases our
             # probability of winning.
-            return random.choice(nonwinning_moves)
+            cols = self._connectm.legal_cols
+            return cols[self._rng.randrange(len(cols))]
 
 
 #
@@ -132,6 +128,17 @@ class SmartBot:
 # test your bot(s)
 #
 
+# When simulating games in multiple processes, each process
+# should play at least this many games (otherwise, the cost
+# of starting the processes outweighs the time saved)
+MIN_GAMES_PER_PROCESS = 1000
+
+# Bot classes, by the name used to select them on the command line
+BOTS: dict[str, type[RandomBot] | type[SmartBot]] = {
+    "random": RandomBot,
+    "smart": SmartBot,
+}
+
 class BotPlayer:
     """
     Simple class to store information about a
@@ -139,13 +146,16 @@ class BotPlayer:
 
     """
 
+    __slots__ = ("name", "suggest_move", "color", "wins")
+
     name: str
-    bot: RandomBot | SmartBot
+    suggest_move: Callable[[], int]
     color: PieceColor
     wins: int
 
     def __init__(self, name: str, connectm: ConnectMBase, color: PieceColor,
-                 opponent_color: PieceColor):
+                 opponent_color: PieceColor,
+                 rng: Optional[random.Random] = None):
         """ Constructor
 
         Args:
@@ -153,47 +163,49 @@ class BotPlayer:
             connectm: The Connect-M board the bot will play in
             color: Bot's color
             opponent_color: Opponent's color
+            rng: Random number generator for the bot to use (if
+              not provided, the bot creates its own)
         """
         self.name = name
 
-        if self.name == "random":
-            self.bot = RandomBot(connectm, color, opponent_color)
-        elif self.name == "smart":
-            self.bot = SmartBot(connectm, color, opponent_color)
+        # We only need the bot's suggest_move method, so we
+        # store it directly (instead of the bot itself)
+        bot = BOTS[self.name](connectm, color, opponent_color, rng)
+        self.suggest_move = bot.suggest_move
         self.color = color
         self.wins = 0
 
 
-def simulate(connectm: ConnectMBase, n: int, bots: dict[PieceColor, BotPlayer]) -> None:
+def simulate(connectm: ConnectMBase, n: int,
+             bots: tuple[BotPlayer, BotPlayer]) -> None:
     """ Simulates multiple games between two bots
 
     Args:
         connectm: The Connect-M board the bot will play in
         n: The number of matches to play
-        bots: Dictionary mapping piece colors to
-            BotPlayer objects (the bots what will
-            face off in each match)
+        bots: The BotPlayer objects (the bots that will
+            face off in each match), indexed by piece color
 
     Returns: None
 
     """
+    # The players take turns, and the piece colors are 0 and 1,
+    # so we switch between them by flipping the index
+    moves = [player.suggest_move for player in bots]
+    colors = tuple(PieceColor)
+    drop = connectm.drop
+
     for _ in range(n):
         # Reset the board
         connectm.reset()
 
         # The starting player is Yellow
-        current = bots[PieceColor.YELLOW]
+        i = int(PieceColor.YELLOW)
 
         # While the game isn't over, make a move
         while not connectm.done:
-            column = current.bot.suggest_move()
-            connectm.drop(column, current.color)
-
-            # Update the player
-            if current.color == PieceColor.YELLOW:
-                current = bots[PieceColor.RED]
-            elif current.color == PieceColor.RED:
-                current = bots[PieceColor.YELLOW]
+            drop(moves[i](), colors[i])
+            i ^= 1
 
         # If there is a winner, add one to that
         # bot's tally
@@ -202,26 +214,120 @@ def simulate(connectm: ConnectMBase, n: int, bots: dict[PieceColor, BotPlayer])
             bots[winner].wins += 1
 
 
+def simulate_random(connectm: ConnectM, n: int,
+                    bots: tuple[BotPlayer, BotPlayer],
+                    rng: random.Random) -> None:
+    """ Simulates multiple games between two random bots
+
+    Same as simulate, but each game is played out directly
+    on the board (see ConnectM.playout), which is much faster
+    than asking a RandomBot for every move.
+
+    Args:
+        connectm: The Connect-M board the bot will play in
+        n: The number of matches to play
+        bots: The BotPlayer objects (both must be random
+            bots), indexed by piece color
+        rng: Random number generator used to play out the games
+
+    Returns: None
+
+    """
+    for _ in range(n):
+        connectm.reset()
+
+        # The starting player is Yellow
+        winner = connectm.playout(PieceColor.YELLOW, rng)
+        if winner is not None:
+            bots[winner].wins += 1
+
+
+def simulate_games(nrows: int, ncols: int, m: int, n: int,
+                   player1: str, player2: str,
+                   seed: Optional[int] = None) -> tuple[int, int]:
+    """ Simulates multiple games between two bots on a new board
+
+    Creates its own board and bots (so it can be run in a
+    separate process) and uses the fastest simulation
+    available for the given bots.
+
+    Args:
+        nrows: Number of rows
+        ncols: Number of columns
+        m: Number of contiguous pieces needed to win
+        n: The number of matches to play
+        player1: Name of the first bot (plays Yellow)
+        player2: Name of the second bot (plays Red)
+        seed: Seed for the random number generator shared by
+            both bots (if None, the results are not reproducible)
+
+    Returns:
+        tuple[int, int]: The number of wins of the first and
+        second bot (respectively)
+
+    """
+    board = ConnectM(nrows, ncols, m)
+    rng = random.Random(seed)
+
+    bot1 = BotPlayer(player1, board, PieceColor.YELLOW, PieceColor.RED, rng)
+    bot2 = BotPlayer(player2, board, PieceColor.RED, PieceColor.YELLOW, rng)
+
+    # Indexed by piece color (red is 0, yellow is 1)
+    bots = (bot2, bot1)
+
+    if player1 == "random" and player2 == "random":
+        simulate_random(board, n, bots, rng)
+    else:
+        simulate(board, n, bots)
+
+    return bot1.wins, bot2.wins
+
+
 @click.command(name="connect4-bot")
 @click.option('-n', '--num-games',  type=click.INT, default=10000)
 @click.option('--player1',
-              type=click.Choice(['random', 'smart'], case_sensitive=False),
+              type=click.Choice(list(BOTS), case_sensitive=False),
               default="random")
 @click.option('--player2',
-              type=click.Choice(['random', 'smart'], case_sensitive=False),
+              type=click.Choice(list(BOTS), case_sensitive=False),
               default="random")
-def cmd(num_games: int, player1: str, player2: str) -> None:
-    board = ConnectM(nrows=6, ncols=7, m=4)
-
-    bot1 = BotPlayer(player1, board, PieceColor.YELLOW, PieceColor.RED)
-    bot2 = BotPlayer(player2, board, PieceColor.RED, PieceColor.YELLOW)
-
-    bots = {PieceColor.YELLOW: bot1, PieceColor.RED: bot2}
-
-    simulate(board, num_games, bots)
+@click.option('-j', '--jobs', type=click.INT, default=None,
+              help="Number of processes to use (defaults to the number of CPUs)")
+@click.option('--seed', type=click.INT, default=None,
+              help="Seed for the random number generators (for reproducible runs)")
+def cmd(num_games: int, player1: str, player2: str, jobs: Optional[int],
+        seed: Optional[int]) -> None:
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, num_games // MIN_GAMES_PER_PROCESS))
+
+    if jobs == 1:
+        bot1_wins, bot2_wins = simulate_games(6, 7, 4, num_games,
+                                              player1, player2, seed)
+    else:
+        # The games are independent of each other, so we split
+        # them (as evenly as possible) between the processes
+        # and add up the results
+        games = [num_games // jobs + (1 if i < num_games % jobs else 0)
+                 for i in range(jobs)]
+
+        # Each process gets its own seed (derived from the given
+        # seed, if any) so they don't all play the same games
+        seeds: list[Optional[int]] = [None] * jobs
+        if seed is not None:
+            seed_rng = random.Random(seed)
+            seeds = [seed_rng.getrandbits(64) for _ in range(jobs)]
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(simulate_games,
+                                        [6] * jobs, [7] * jobs, [4] * jobs,
+                                        games,
+                                        [player1] * jobs, [player2] * jobs,
+                                        seeds))
+
+        bot1_wins = sum(wins for wins, _ in results)
+        bot2_wins = sum(wins for _, wins in results)
 
-    bot1_wins = bots[PieceColor.YELLOW].wins
-    bot2_wins = bots[PieceColor.RED].wins
     ties = num_games - (bot1_wins + bot2_wins)
 
     print(f"Bot 1 ({player1}) wins: {100 * bot1_wins / num_games:.2f}%")
@@ -2,27 +2,72 @@
 Implementation of Connect-M (a generalized form of Connect Four)
 """
 
-import copy
-from typing import Optional
+import random
+from typing import Iterator, Optional
 
 from base import ConnectMBase, PieceColor
 
+# Piece color for each value in ConnectM._cells
+CELL_COLORS: tuple[Optional[PieceColor], ...] = (None, PieceColor.RED,
+                                                 PieceColor.YELLOW)
+
+# Character printed for each value in ConnectM._cells
+CELL_CHARS = " RY"
+
 
 class ConnectM(ConnectMBase):
     """
     Class for representing a Connect-M board
     """
 
+    __slots__ = ("_bbs", "_cells", "_heights", "_legal_cols", "_plies",
+                 "_winner", "_max_plies", "_stride", "_dirs", "_win_shifts",
+                 "_col_bases", "_col_top_bit")
+
     #
     # PRIVATE ATTRIBUTES
     #
 
-    # The board itself
-    _board: list[list[Optional[PieceColor]]]
+    # The board itself, stored as two bitboards (one per color,
+    # indexed by PieceColor). Location (row, col) corresponds to
+    # bit col * (nrows + 1) + row, so each column takes up nrows + 1
+    # bits. The extra bit at the top of each column is always zero,
+    # so pieces in one column never appear contiguous with pieces
+    # in the next column.
+    _bbs: list[int]
+
+    # The same board, with one byte per location (indexed like the
+    # bits in the bitboards): 0 if the location is empty, or the
+    # color of the piece plus one. This makes it cheap to produce
+    # the grid, which the GUI and TUI ask for on every frame.
+    _cells: bytearray
+
+    # Bit index of the next free location in each column
+    _heights: list[int]
+
+    # Columns that are not full yet
+    _legal_cols: list[int]
+
+    # Number of pieces dropped so far
+    _plies: int
 
     # The winner (if any) on the board
     _winner: Optional[PieceColor]
 
+    # Values that only depend on the size of the board, computed
+    # once in the constructor: the number of pieces that fit in
+    # the board, the number of bits per column, the shifts for
+    # the four directions a line can go in, the shifts _is_win
+    # uses to look for a line in each direction, the bit index of
+    # the bottom of each column, and a mask with the topmost
+    # location of each column.
+    _max_plies: int
+    _stride: int
+    _dirs: tuple[int, int, int, int]
+    _win_shifts: tuple[tuple[int, ...], ...]
+    _col_bases: tuple[int, ...]
+    _col_top_bit: tuple[int, ...]
+
     #
     # PUBLIC METHODS
     #
@@ -37,23 +82,52 @@ class ConnectM(ConnectMBase):
             m (int): Number of contiguous pieces needed to win
         """
         super().__init__(nrows, ncols, m)
-        self._board = [[None] * ncols for _ in range(nrows)]
-        self._top = [0] * ncols
+
+        # Moving by one bit moves us up a column, and moving by
+        # stride bits moves us along a row. The two diagonals
+        # are stride - 1 and stride + 1 bits apart.
+        self._max_plies = nrows * ncols
+        self._stride = nrows + 1
+        self._dirs = (1, self._stride, self._stride - 1, self._stride + 1)
+
+        # To find M contiguous pieces, we keep doubling the length
+        # of the runs we look for (1, 2, 4, ...), and then extend
+        # them by whatever remains up to M (see _is_win). The number
+        # of pieces added at each step is the same in every direction,
+        # so we only need to multiply them by each direction's shift.
+        steps = []
+        n = 1
+        while 2 * n <= m:
+            steps.append(n)
+            n *= 2
+        if n < m:
+            steps.append(m - n)
+        self._win_shifts = tuple(tuple(step * d for step in steps)
+                                 for d in self._dirs)
+
+        self._col_bases = tuple(col * self._stride for col in range(ncols))
+        self._col_top_bit = tuple(1 << (base + nrows - 1)
+                                  for base in self._col_bases)
+
+        self._bbs = [0, 0]
+        self._cells = bytearray(ncols * self._stride)
+        self._heights = list(self._col_bases)
+        self._legal_cols = list(range(ncols))
+        self._plies = 0
         self._winner = None
 
     def __str__(self) -> str:
         """ Returns a string representation of the board """
-        s = "-" * self._ncols + "\n"
-        for row in self._board:
-            for value in row:
-                if value is None:
-                    s += " "
-                else:
-                    s += value.name[0]
-            s += "\n"
-        s += "-" * self._ncols
-
-        return s
+        cells = self._cells
+        border = "-" * self._ncols
+        lines = [border]
+        # Rows are printed starting from the top of the board
+        for row in range(self._nrows - 1, -1, -1):
+            lines.append("".join([CELL_CHARS[cells[base + row]]
+                                  for base in self._col_bases]))
+        lines.append(border)
+
+        return "\n".join(lines)
 
     #
     # PUBLIC METHODS
@@ -73,7 +147,11 @@ class ConnectM(ConnectMBase):
             specified column. False otherwise.
 
         """
-        return self._top[col] < self._nrows
+        # Negative indices would wrap around to the last columns
+        if not 0 <= col < self._ncols:
+            raise IndexError(f"Invalid column index {col}")
+
+        return not ((self._bbs[0] | self._bbs[1]) & self._col_top_bit[col])
 
     def drop_wins(self, col: int, color: PieceColor) -> bool:
         """ Checks whether dropping a piece in this
@@ -92,19 +170,41 @@ class ConnectM(ConnectMBase):
             color would result in a win; False otherwise.
 
         """
+        if not 0 <= col < self._ncols:
+            raise ValueError(f"Invalid column index {col}")
+
         # If we can't drop a piece in the column, it
         # naturally won't result in a win
         if not self.can_drop(col):
             return False
 
-        # Temporarily drop the piece into the column,
-        # check if there is a winner, and undo the drop
-        row = self._top[col]
-        self._set(row, col, color)
-        winner = self._winner_at(row, col)
-        self._set(row, col, None)
+        # Check the bitboard we would get by adding the piece,
+        # without modifying the board itself
+        return self._is_win(self._bbs[color] | (1 << self._heights[col]))
 
-        return winner
+    def winning_cols(self, color: PieceColor) -> list[int]:
+        """ Returns the columns where dropping a piece
+        would result in a win.
+
+        Args:
+            color: Color of the piece to drop
+
+        Returns:
+            list[int]: The indices of the (non-full) columns where
+            dropping a piece of the given color would result in
+            a win, in increasing order.
+
+        """
+        # Instead of checking for a win in every column, we find
+        # all the locations that would give us a winning line,
+        # and then check which columns have one as their next
+        # free location
+        squares = self._winning_squares(self._bbs[color])
+        if not squares:
+            return []
+
+        return [col for col in self._legal_cols
+                if (squares >> self._heights[col]) & 1]
 
     def drop(self, col: int, color: PieceColor) -> None:
         """ Drops a piece in a column
@@ -120,14 +220,22 @@ class ConnectM(ConnectMBase):
         Returns: None
 
         """
+        # Check the column before changing anything, so an
+        # invalid drop leaves the board untouched
+        if not 0 <= col < self._ncols:
+            raise ValueError(f"Invalid column index {col}")
         if not self.can_drop(col):
             raise ValueError(f"Cannot drop a piece in column {col}")
 
-        row = self._top[col]
-        self._set(row, col, color)
-        self._top[col] += 1
+        bit = 1 << self._heights[col]
+        self._bbs[color] |= bit
+        self._cells[self._heights[col]] = color + 1
+        self._heights[col] += 1
+        self._plies += 1
+        if bit & self._col_top_bit[col]:
+            self._legal_cols.remove(col)
 
-        if self._winner_at(row, col):
+        if self._is_win(self._bbs[color]):
             self._winner = color
 
     def reset(self) -> None:
@@ -138,14 +246,68 @@ class ConnectM(ConnectMBase):
         Returns: None
 
         """
-        for row in self._board:
-            for i, _ in enumerate(row):
-                row[i] = None
+        # Update the existing lists in place (the board may be
+        # reset thousands of times when simulating games)
+        self._bbs[0] = self._bbs[1] = 0
+        self._cells[:] = bytes(len(self._cells))
+        self._heights[:] = self._col_bases
+        self._legal_cols[:] = range(self._ncols)
+        self._plies = 0
+        self._winner = None
 
-        for i, _ in enumerate(self._top):
-            self._top[i] = 0
+    def playout(self, color: PieceColor,
+                rng: random.Random) -> Optional[PieceColor]:
+        """ Plays out the rest of the game with random moves
 
-        self._winner = None
+        Starting with a piece of the given color, drops pieces
+        of alternating colors in columns chosen at random (among
+        the columns that are not full) until the game is done.
+
+        This is equivalent to having two RandomBots play against
+        each other, but works directly on the bitboards instead
+        of going through the bots and the public methods on
+        every move, which makes it much faster when simulating
+        a large number of games.
+
+        Args:
+            color: Color of the first piece to drop
+            rng: Random number generator used to choose the moves
+
+        Returns:
+            Optional[PieceColor]: If there is a winner,
+            return its color. Otherwise, return None.
+
+        """
+        legal = self._legal_cols
+        bbs = self._bbs
+        cells = self._cells
+        colors = (PieceColor.RED, PieceColor.YELLOW)
+        i = int(color)
+        heights = self._heights
+        col_top_bit = self._col_top_bit
+        plies = self._plies
+
+        winner = self._winner
+        while winner is None and legal:
+            col = legal[rng.randrange(len(legal))]
+            bit = 1 << heights[col]
+            cells[heights[col]] = i + 1
+            heights[col] += 1
+            plies += 1
+            if bit & col_top_bit[col]:
+                legal.remove(col)
+
+            bbs[i] |= bit
+            if self._is_win(bbs[i]):
+                winner = colors[i]
+
+            # The other color drops the next piece
+            i ^= 1
+
+        self._plies = plies
+        self._winner = winner
+
+        return winner
 
     @property
     def done(self) -> bool:
@@ -160,14 +322,7 @@ class ConnectM(ConnectMBase):
             bool: True if the game is done. False otherwise.
 
         """
-        if self.winner is not None:
-            return True
-        else:
-            # Check if all the columns are full
-            for top_row in self._top:
-                if top_row < self._nrows:
-                    return False
-            return True
+        return self._winner is not None or self._plies == self._max_plies
 
     @property
     def winner(self) -> Optional[PieceColor]:
@@ -180,6 +335,20 @@ class ConnectM(ConnectMBase):
         """
         return self._winner
 
+    @property
+    def legal_cols(self) -> list[int]:
+        """ Returns the columns a piece can be dropped into
+
+        The list is updated as pieces are dropped (instead of
+        checking every column each time), so callers should
+        not modify it.
+
+        Returns:
+            list[int]: The indices of the columns that are not full,
+            in increasing order.
+        """
+        return self._legal_cols
+
     @property
     def grid(self) -> list[list[Optional[PieceColor]]]:
         """ Returns the board as a list of list of PieceColors
@@ -194,120 +363,92 @@ class ConnectM(ConnectMBase):
             (red piece), or PieceColor.YELLOW (yellow piece)
         """
 
-        # The expected return type happens to be our internal
-        # representation for the board, so we just return a copy
-        return copy.deepcopy(self._board)
-
-    #
-    # PRIVATE METHODS
-    #
+        # Rows in the grid are numbered from the top of the board,
+        # so we build it starting from the highest row
+        return [[CELL_COLORS[self._cells[base + row]]
+                 for base in self._col_bases]
+                for row in range(self._nrows - 1, -1, -1)]
 
-    def _get(self, row: int, col: int) -> Optional[PieceColor]:
-        """ Gets piece color (if any) at a given location.
+    def iter_cells(self) -> Iterator[tuple[int, int, Optional[PieceColor]]]:
+        """ Iterates over the cells of the board
 
-        Rows are numbered from 0 starting at the bottom of the board.
-
-        Args:
-            row (int): Row index
-            col (int): Column index
+        The cells are produced in the same order, and with the same
+        row and column numbers, as in the grid property, but are
+        read directly from the board (without building the grid).
 
         Returns:
-            Optional[PieceColor]: If there is a piece in the provided
-            location, returns the PieceColor object at that location.
-            Otherwise, returns None. Also returns None if the (row, col)
-            coordinates are not valid.
-        """
-        if not (0 <= row < self._nrows):
-            return None
-        elif not (0 <= col < self._ncols):
-            return None
-        else:
-            return self._board[(self._nrows - 1) - row][col]
-
-    def _set(self, row: int, col: int, color: Optional[PieceColor]) -> None:
-        """ Sets piece color at a given location.
-
-        Rows are numbered from 0 starting at the bottom of the board.
-
-        Args:
-            row (int): Row index
-            col (int): Column index
-            color (Optional[PieceColor]): Color to set the location to.
-              Can also be None to clear the piece in that location.
-
-        Raises:
-            ValueError: If the provided location is not valid
-
-        Returns: None
+            Iterator[tuple[int, int, Optional[PieceColor]]]: The row,
+            column, and value (None, PieceColor.RED, or
+            PieceColor.YELLOW) of each cell
         """
-        assert 0 <= row < self._nrows
-        assert 0 <= col < self._ncols
+        cells = self._cells
+        for i in range(self._nrows):
+            row = self._nrows - 1 - i
+            for j, base in enumerate(self._col_bases):
+                yield i, j, CELL_COLORS[cells[base + row]]
 
-        self._board[(self._nrows - 1) - row][col] = color
+    #
+    # PRIVATE METHODS
+    #
 
-    def _winner_at(self, row: int, col: int) -> bool:
-        """ Checks for a winner at a location
+    def _is_win(self, bb: int) -> bool:
+        """ Checks whether a bitboard contains a winning line
 
-        Checks whether the specified location contains
-        a winning row, column, or diagonal.
+        Checks whether the pieces in the bitboard include M
+        contiguous pieces along a row, column, or diagonal.
 
         Args:
-            row (int): Row index
-            col (int): Column index
+            bb (int): Bitboard with the pieces of a single color
 
         Returns:
-            bool: True if there is a winner at the specified
-            location. False otherwise.
+            bool: True if there is a winning line in the
+            bitboard. False otherwise.
         """
-
-        dirs = [(+1, -1), (+1, 0), (+1, +1),
-                ( 0, -1),          ( 0, +1),
-                (-1, -1), (-1, 0), (-1, +1)]
-
-        # For every possible direction, count the number
-        # of adjacent pieces, up to a maximum on m-1
-        adj_dir = {}
-        origin_piece = self._get(row, col)
-        for dr, dc in dirs:
-            adj_dir[(dr, dc)] = 0
-
-            # Start at the 'origin' (row, col)
-            ir, ic = row, col
-            for _ in range(self._m-1):
-                # At each step, add the direction (dr, dc)
-                # Get the piece at that location, and compare
-                # it with the original piece
-                ir, ic = ir + dr, ic + dc
-                piece = self._get(ir, ic)
-                if piece == origin_piece:
-                    adj_dir[(dr, dc)] += 1
-                else:
+        for shifts in self._win_shifts:
+            # After each step, a bit in x is set if there is a
+            # run of contiguous pieces starting at that location
+            # (the run gets longer with each step, until it has M
+            # pieces; see the constructor). Once there are no runs
+            # left, there is no point in making them longer.
+            x = bb
+            for shift in shifts:
+                x &= x >> shift
+                if not x:
                     break
 
-            # If there are M-1 adjacent pieces in this
-            # direction, we know we have a winner.
-            if adj_dir[(dr, dc)] == self._m - 1:
+            if x:
                 return True
 
-        # If after looking in each direction we didn't see
-        # M contiguous piece, we now need to check whether
-        # adding the contiguous pieces along a row, column,
-        # or the two diagonals yields a winner.
-
-        # Rows
-        if adj_dir[(0, -1)] + 1 + adj_dir[(0, +1)] >= self._m:
-            return True
-
-        # Columns
-        if adj_dir[(+1, 0)] + 1 + adj_dir[(-1, 0)] >= self._m:
-            return True
+        return False
 
-        # Diagonal \
-        if adj_dir[(+1, -1)] + 1 + adj_dir[(-1, +1)] >= self._m:
-            return True
+    def _winning_squares(self, bb: int) -> int:
+        """ Finds the locations that would complete a winning line
 
-        # Diagonal /
-        if adj_dir[(-1, -1)] + 1 + adj_dir[(+1, +1)] >= self._m:
-            return True
+        Args:
+            bb (int): Bitboard with the pieces of a single color
 
-        return False
+        Returns:
+            int: Bitboard with a bit set at every empty location
+            where adding a piece to the bitboard would result in
+            M contiguous pieces along a row, column, or diagonal.
+        """
+        m = self._m
+        squares = 0
+
+        for d in self._dirs:
+            # A bit in before[i] is set if there are i contiguous
+            # pieces right before that location (in direction d),
+            # and a bit in after[i] is set if there are i contiguous
+            # pieces right after it. Adding a piece at a location
+            # with i pieces before it and M - 1 - i pieces after it
+            # gives us M contiguous pieces.
+            before = [-1]
+            after = [-1]
+            for i in range(1, m):
+                before.append(before[-1] & (bb << (i * d)))
+                after.append(after[-1] & (bb >> (i * d)))
+
+            for i in range(m):
+                squares |= before[i] & after[m - 1 - i]
+
+        return squares & ~(self._bbs[0] | self._bbs[1])
@@ -3,8 +3,7 @@ Fake implementations of the ConnectMBase class
 """
 
 from base import ConnectMBase, PieceColor
-from typing import Optional
-from copy import deepcopy
+from typing import ClassVar, Optional, Sequence
 
 
 class ConnectMStub(ConnectMBase):
@@ -12,11 +11,16 @@ class ConnectMStub(ConnectMBase):
     Stub implementation of the ConnectMBase class
     """
 
-    _board: list[list[Optional[PieceColor]]]
+    __slots__ = ("_board",)
+
+    # The stub never modifies the board, so every row
+    # is the same (immutable) empty row
+    _board: list[tuple[Optional[PieceColor], ...]]
 
     def __init__(self, nrows: int, ncols: int, m: int):
         super().__init__(nrows, ncols, m)
-        self._board = [[None] * ncols for _ in range(nrows)]
+        empty: tuple[Optional[PieceColor], ...] = (None,) * ncols
+        self._board = [empty] * nrows
 
     def __str__(self) -> str:
         return "BOARD"
@@ -43,7 +47,7 @@ class ConnectMStub(ConnectMBase):
 
     @property
     def grid(self) -> list[list[Optional[PieceColor]]]:
-        return deepcopy(self._board)
+        return [list(row) for row in self._board]
 
 
 class ConnectMFake(ConnectMBase):
@@ -51,54 +55,58 @@ class ConnectMFake(ConnectMBase):
     Fake implementation of the ConnectMBase class
 
     Expected behaviours:
-    - Stores the full board internally, but we only ever
-      modify the bottom row of the board. i.e., we
-      effectively have a 1-row board, even if we display
-      a larger board.
+    - Only ever modifies the bottom row of the board, which
+      is stored as a pair of bitmasks. i.e., we effectively
+      have a 1-row board, even if we display a larger board.
     - Game ends after M moves. If M is even, Red wins;
       otherwise, Yellow wins.
     """
 
-    _board: list[list[Optional[PieceColor]]]
+    __slots__ = ("_bbs", "_nummoves", "_win_color")
+
+    # One bitmask per color (indexed by PieceColor): bit col is
+    # set if the bottom-row cell in that column holds that color
+    _bbs: list[int]
     _nummoves: int
+    # The color that wins once M moves have been made
+    _win_color: PieceColor
+
+    # Character used to print each kind of cell
+    _GLYPHS: ClassVar[dict[Optional[PieceColor], str]] = {
+        None: "·",
+        PieceColor.RED: "R",
+        PieceColor.YELLOW: "Y",
+    }
 
     def __init__(self, nrows: int, ncols: int, m: int):
         super().__init__(nrows, ncols, m)
-        self._board = [[None] * ncols for _ in range(nrows)]
+        self._bbs = [0, 0]
         self._nummoves = 0
+        if m % 2 == 0:
+            self._win_color = PieceColor.RED
+        else:
+            self._win_color = PieceColor.YELLOW
 
     def __str__(self) -> str:
-        lines = []
-        for row in self._board:
-            s = ""
-            for p in row:
-                if p is None:
-                    s += "·"
-                else:
-                    s += p.name[0]
-            lines.append(s)
-            
-        return "\n".join(lines)
+        glyphs = self._GLYPHS
+        return "\n".join("".join([glyphs[p] for p in row])
+                         for row in self.grid)
 
     def can_drop(self, col: int) -> bool:
-        return self._board[-1][col] is None
+        return not ((self._bbs[0] | self._bbs[1]) >> col) & 1
 
     def drop_wins(self, col: int, color: PieceColor) -> bool:
         # Check if the next move ends the game:
-        if self._nummoves == self._m - 1:
-            if self._m % 2 == 0:
-                return color == PieceColor.RED
-            else:
-                return color == PieceColor.YELLOW
-
-        return False
+        return self._nummoves == self._m - 1 and color is self._win_color
 
     def drop(self, col: int, color: PieceColor) -> None:
-        self._board[-1][col] = color
+        bit = 1 << col
+        self._bbs[color] |= bit
+        self._bbs[color ^ 1] &= ~bit
         self._nummoves += 1
 
     def reset(self) -> None:
-        self._board = [[None] * self._ncols for _ in range(self._nrows)]
+        self._bbs[0] = self._bbs[1] = 0
 
     @property
     def done(self) -> bool:
@@ -107,16 +115,24 @@ class ConnectMFake(ConnectMBase):
     @property
     def winner(self) -> Optional[PieceColor]:
         if self._nummoves == self._m:
-            if self._m % 2 == 0:
-                return PieceColor.RED
-            else:
-                return PieceColor.YELLOW
+            return self._win_color
         else:
             return None
 
     @property
     def grid(self) -> list[list[Optional[PieceColor]]]:
-        return deepcopy(self._board)
+        red, yellow = self._bbs
+        bottom: list[Optional[PieceColor]] = []
+        for col in range(self._ncols):
+            if (red >> col) & 1:
+                bottom.append(PieceColor.RED)
+            elif (yellow >> col) & 1:
+                bottom.append(PieceColor.YELLOW)
+            else:
+                bottom.append(None)
+        empty: list[list[Optional[PieceColor]]] = \
+            [[None] * self._ncols for _ in range(self._nrows - 1)]
+        return empty + [bottom]
 
 
 class ConnectMBotFake(ConnectMBase):
@@ -130,23 +146,67 @@ class ConnectMBotFake(ConnectMBase):
     and get_num_cols (and stub out the remaining
     methods).
 
-    This fake will use two lists: one to specify
+    This fake is set up with two lists: one to specify
     whether a piece can be dropped in a given column,
     and another to specify whether a drop in a column
-    will result in a win for a player. can_drop
-    and drop_wins will just return whatever is in
-    those lists.
+    will result in a win for a player. Internally, the
+    lists are stored as bitmasks (bit col is set if the
+    column's entry is true, or is a win for that color),
+    and can_drop and drop_wins just look up the bit.
+
+    To set up the fake, assign a whole list to _can_drop
+    or _drop_wins (e.g., board._can_drop = [True, False, ...]).
+    Reading them back gives a tuple, so changing a single
+    entry in place (board._can_drop[3] = False) raises a
+    TypeError instead of silently doing nothing.
 
     """
 
-    _can_drop: list[bool]
-    _drop_wins: list[Optional[PieceColor]]
+    __slots__ = ("_can_drop_mask", "_drop_wins_masks")
+
+    _can_drop_mask: int
+    # One mask per color (indexed by PieceColor)
+    _drop_wins_masks: list[int]
 
     def __init__(self, nrows: int, ncols: int, m: int):
         super().__init__(nrows, ncols, m)
         self._can_drop = [True] * ncols
         self._drop_wins = [None] * ncols
 
+    @property
+    def _can_drop(self) -> tuple[bool, ...]:
+        return tuple([bool((self._can_drop_mask >> col) & 1)
+                      for col in range(self._ncols)])
+
+    @_can_drop.setter
+    def _can_drop(self, values: Sequence[bool]) -> None:
+        mask = 0
+        for col, value in enumerate(values):
+            if value:
+                mask |= 1 << col
+        self._can_drop_mask = mask
+
+    @property
+    def _drop_wins(self) -> tuple[Optional[PieceColor], ...]:
+        red, yellow = self._drop_wins_masks
+        values: list[Optional[PieceColor]] = []
+        for col in range(self._ncols):
+            if (red >> col) & 1:
+                values.append(PieceColor.RED)
+            elif (yellow >> col) & 1:
+                values.append(PieceColor.YELLOW)
+            else:
+                values.append(None)
+        return tuple(values)
+
+    @_drop_wins.setter
+    def _drop_wins(self, values: Sequence[Optional[PieceColor]]) -> None:
+        masks = [0, 0]
+        for col, color in enumerate(values):
+            if color is not None:
+                masks[color] |= 1 << col
+        self._drop_wins_masks = masks
+
     def __str__(self) -> str:
         return "BOARD"
 
@@ -154,13 +214,13 @@ class ConnectMBotFake(ConnectMBase):
         if not 0 <= col < self._ncols:
             return False
         else:
-            return self._can_drop[col]
+            return bool((self._can_drop_mask >> col) & 1)
 
     def drop_wins(self, col: int, color: PieceColor) -> bool:
         if not 0 <= col < self._ncols:
             return False
         else:
-            return self._drop_wins[col] == color
+            return bool((self._drop_wins_masks[color] >> col) & 1)
 
     def drop(self, col: int, color: PieceColor) -> None:
         return None
@@ -4,7 +4,8 @@ GUI for Connect Four
 
 import os
 import sys
-from typing import Union
+from functools import lru_cache
+from typing import Optional, Union
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
@@ -17,6 +18,31 @@ from bot import RandomBot, SmartBot
 DEFAULT_SIDE = 75
 SMALL_SIDE = 40
 
+# Color used to draw each kind of piece (None is an empty cell)
+PIECE_COLORS: dict[Optional[PieceColor], tuple[int, int, int]] = {
+    None: (255, 255, 255),
+    PieceColor.RED: (255, 0, 0),
+    PieceColor.YELLOW: (255, 255, 0),
+}
+
+# Column selected by each number key, on the top row or the
+# number pad (1-9 are columns 0-8, 0 is column 9)
+KEY_COLUMNS: dict[int, int] = {
+    pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2, pygame.K_4: 3,
+    pygame.K_5: 4, pygame.K_6: 5, pygame.K_7: 6, pygame.K_8: 7,
+    pygame.K_9: 8, pygame.K_0: 9,
+    pygame.K_KP1: 0, pygame.K_KP2: 1, pygame.K_KP3: 2, pygame.K_KP4: 3,
+    pygame.K_KP5: 4, pygame.K_KP6: 5, pygame.K_KP7: 6, pygame.K_KP8: 7,
+    pygame.K_KP9: 8, pygame.K_KP0: 9,
+}
+
+# Column selected by each digit typed (used for keyboard layouts,
+# like AZERTY, where digits are not on the number keys above)
+CHAR_COLUMNS: dict[str, int] = {
+    "1": 0, "2": 1, "3": 2, "4": 3, "5": 4,
+    "6": 5, "7": 6, "8": 7, "9": 8, "0": 9,
+}
+
 
 class GUIPlayer:
     """
@@ -26,6 +52,8 @@ class GUIPlayer:
     or a bot.
     """
 
+    __slots__ = ("name", "bot", "connectm", "color")
+
     name: str
     bot: Union[None, RandomBot, SmartBot]
     connectm: ConnectMBase
@@ -56,6 +84,70 @@ class GUIPlayer:
         self.color = color
 
 
+@lru_cache
+def cell_positions(width: int, height: int, nrows: int,
+                   ncols: int) -> tuple[tuple[int, int], ...]:
+    """ Computes where each cell of the board is drawn
+
+    This only depends on the size of the window and the board,
+    so we compute it once (instead of every time we draw the board)
+
+    Args:
+        width: Width of the surface the board is drawn on
+        height: Height of the surface the board is drawn on
+        nrows: Number of rows in the board
+        ncols: Number of columns in the board
+
+    Returns:
+        tuple[tuple[int, int], ...]: The top-left corner of each
+        cell, in the same order as the cells in the board's grid
+
+    """
+    # Compute the row height and column width
+    rh = height // nrows
+    cw = width // ncols
+
+    return tuple((col * cw, row * rh)
+                 for row in range(nrows) for col in range(ncols))
+
+
+@lru_cache
+def cell_images(cw: int, rh: int) -> dict[Optional[PieceColor],
+                                          pygame.surface.Surface]:
+    """ Draws a cell of the board with each kind of piece
+
+    Drawing the board then only requires copying one of these
+    images into each cell, instead of drawing every cell
+    (including its border and circle) from scratch.
+
+    Args:
+        cw: Width of a cell
+        rh: Height of a cell
+
+    Returns:
+        dict[Optional[PieceColor], pygame.surface.Surface]: An image
+        of a cell for each value a cell can have (None for an empty
+        cell, PieceColor.RED, and PieceColor.YELLOW)
+
+    """
+    images = {}
+    for piece_color, color in PIECE_COLORS.items():
+        image = pygame.Surface((cw, rh))
+        image.fill((64, 128, 255))
+
+        # Draw the border around the cell
+        pygame.draw.rect(image, color=(32, 32, 192),
+                         rect=(0, 0, cw, rh), width=2)
+
+        # Draw the circle
+        pygame.draw.circle(image, color=color,
+                           center=(cw // 2, rh // 2), radius=rh // 2 - 8)
+
+        images[piece_color] = image
+
+    return images
+
+
 def draw_board(surface: pygame.surface.Surface, connectm: ConnectMBase) -> None:
     """ Draws the current state of the board in the window
 
@@ -66,39 +158,20 @@ def draw_board(surface: pygame.surface.Surface, connectm: ConnectMBase) -> None:
     Returns: None
 
     """
-    grid = connectm.grid
     nrows = connectm.num_rows
     ncols = connectm.num_cols
 
     width, height = surface.get_size()
+    positions = cell_positions(width, height, nrows, ncols)
+    images = cell_images(width // ncols, height // nrows)
 
     surface.fill((64, 128, 255))
 
-    # Compute the row height and column width
-    rh = height // nrows
-    cw = width // ncols
-
-    # Draw the borders around each cell
-    for row in range(nrows):
-        for col in range(ncols):
-            rect = (col * cw, row * rh, cw, rh)
-            pygame.draw.rect(surface, color=(32, 32, 192),
-                             rect=rect, width=2)
-
-    # Draw the circles
-    for i, r in enumerate(grid):
-        for j, piece_color in enumerate(r):
-            if piece_color is None:
-                color = (255, 255, 255)
-            elif piece_color == PieceColor.RED:
-                color = (255, 0, 0)
-            elif piece_color == PieceColor.YELLOW:
-                color = (255, 255, 0)
-
-            center = (j * cw + cw // 2, i * rh + rh // 2)
-            radius = rh // 2 - 8
-            pygame.draw.circle(surface, color=color,
-                               center=center, radius=radius)
+    # Copy the image for each cell into place (with a
+    # single call, instead of one call per cell)
+    surface.blits([(images[piece_color], positions[row * ncols + col])
+                   for row, col, piece_color in connectm.iter_cells()],
+                  doreturn=False)
 
 
 def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
@@ -130,6 +203,12 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
     surface = pygame.display.set_mode((width, height))
     clock = pygame.time.Clock()
 
+    # The board is drawn on a separate surface, and we only
+    # redraw it when a piece is dropped (on other frames,
+    # we just copy it to the window)
+    board_surface = pygame.Surface((width, height))
+    board_changed = True
+
     # The starting player is yellow
     current = players[PieceColor.YELLOW]
 
@@ -149,14 +228,11 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
             # current player is a human
             if current.bot is None: 
                 if event.type == pygame.KEYUP and connectm.num_cols <= 10:
-                    key = event.unicode
-                    v = None
-                    if key in "123456789":
-                        v = int(key) - 1
-                    elif key == "0":
-                        v = 9
-
-                    if v is not None and connectm.can_drop(v):
+                    v = KEY_COLUMNS.get(event.key)
+                    if v is None:
+                        v = CHAR_COLUMNS.get(event.unicode)
+                    if (v is not None and v < connectm.num_cols
+                            and connectm.can_drop(v)):
                         column = v
                 elif event.type == pygame.MOUSEBUTTONUP:
                     x = event.pos[0]
@@ -165,7 +241,16 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
         # If the current player is a bot, have it suggest
         # a move
         if current.bot is not None:
-            pygame.time.wait(int(bot_delay * 1000))
+            # Wait for the bot delay to pass, sleeping until
+            # there is an event (so we can still quit the game
+            # while we wait)
+            deadline = pygame.time.get_ticks() + int(bot_delay * 1000)
+            while (remaining := deadline - pygame.time.get_ticks()) > 0:
+                event = pygame.event.wait(remaining)
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
             column = current.bot.suggest_move()
 
         # If there is a column to drop a piece in
@@ -173,6 +258,7 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
         # or a bot suggested one), make a move
         if column is not None:
             connectm.drop(column, current.color)
+            board_changed = True
 
             # Update the player
             if current.color == PieceColor.YELLOW:
@@ -181,7 +267,10 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, GUIPlayer],
                 current = players[PieceColor.YELLOW]
 
         # Update the display
-        draw_board(surface, connectm)
+        if board_changed:
+            draw_board(board_surface, connectm)
+            board_changed = False
+        surface.blit(board_surface, (0, 0))
         pygame.display.update()
         clock.tick(24)
 
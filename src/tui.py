@@ -1,9 +1,11 @@
 """
 TUI for Connect Four
 """
+import io
 import sys
 import time
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, TextIO
 
 import click
 from colorama import Fore, Style
@@ -21,6 +23,8 @@ class TUIPlayer:
     or a bot.
     """
 
+    __slots__ = ("name", "bot", "connectm", "color", "bot_delay")
+
     name: str
     bot: None | RandomBot | SmartBot
     connectm: ConnectMBase
@@ -64,7 +68,8 @@ class TUIPlayer:
 
         """
         if self.bot is not None:
-            time.sleep(self.bot_delay)
+            if self.bot_delay > 0:
+                time.sleep(self.bot_delay)
             column = self.bot.suggest_move()
             # Print prompt with column already filled in
             print(Style.BRIGHT + f"{self.name}> " + Style.RESET_ALL + str(column+1))
@@ -73,48 +78,76 @@ class TUIPlayer:
             # Ask for a column (and re-ask if
             # a valid column is not provided)
             while True:
-                v = input(Style.BRIGHT + f"{self.name}> " + Style.RESET_ALL)
-                if v.isnumeric():
-                    try:
-                        col = int(v) - 1
-                        if col < self.connectm.num_cols and self.connectm.can_drop(col):
-                            return col
-                    except ValueError:
-                        continue
+                v = input(Style.BRIGHT + f"{self.name}> " + Style.RESET_ALL).strip()
+                # int() refuses very long strings of digits, so we only
+                # convert numbers with no more digits than the largest column
+                max_digits = len(str(self.connectm.num_cols))
+                if v.isdecimal() and len(v.lstrip("0")) <= max_digits:
+                    col = int(v) - 1
+                    if 0 <= col < self.connectm.num_cols and self.connectm.can_drop(col):
+                        return col
+                print(f"Please enter a column between 1 and {self.connectm.num_cols} "
+                      "that is not full")
+
+
+# Text drawn for each kind of cell, including the border to its right
+CELL_GLYPHS: dict[Optional[PieceColor], str] = {
+    None: " " + Fore.BLUE + Style.NORMAL + "│",
+    PieceColor.RED: Fore.RED + Style.BRIGHT + "●" + Fore.BLUE + Style.NORMAL + "│",
+    PieceColor.YELLOW: Fore.YELLOW + Style.BRIGHT + "●" + Fore.BLUE + Style.NORMAL + "│",
+}
+
+# The color that plays after each color
+NEXT_COLOR: dict[PieceColor, PieceColor] = {
+    PieceColor.YELLOW: PieceColor.RED,
+    PieceColor.RED: PieceColor.YELLOW,
+}
+
+
+@lru_cache
+def row_separators(ncols: int) -> tuple[str, str, str]:
+    """ Builds the lines drawn above, between, and below the rows
+
+    These only depend on the number of columns, so we build
+    them once (instead of every time we print the board)
+
+    Args:
+        ncols: Number of columns in the board
+
+    Returns:
+        tuple[str, str, str]: The top line, the line between
+        two rows, and the bottom line (each ending in a newline)
+    """
+    top = Fore.BLUE + "┌" + ("─┬" * (ncols-1)) + "─┐\n"
+    mid = Fore.BLUE + "├" + ("─┼" * (ncols-1)) + "─┤\n"
+    bot = Fore.BLUE + "└" + ("─┴" * (ncols-1)) + "─┘" + Style.RESET_ALL + "\n"
+    return top, mid, bot
 
 
-def print_board(grid: list[list[Optional[PieceColor]]]) -> None:
+def print_board(grid: list[list[Optional[PieceColor]]],
+                out: Optional[TextIO] = None) -> None:
     """ Prints the board to the screen
 
     Args:
         grid: The board to print
+        out: Where to write the board (defaults to standard output)
 
     Returns: None
     """
+    if out is None:
+        out = sys.stdout
 
-    nrows = len(grid)
-    ncols = len(grid[0])
-
-    # Top row
-    print(Fore.BLUE + "┌" + ("─┬" * (ncols-1)) + "─┐")
-
-    for r in range(nrows):
-        crow = "│"
-        for c in range(ncols):
-            v = grid[r][c]
-            if v is None:
-                crow += " "
-            elif v == PieceColor.RED:
-                crow += Fore.RED + Style.BRIGHT + "●"
-            elif v == PieceColor.YELLOW:
-                crow += Fore.YELLOW + Style.BRIGHT + "●"
-            crow += Fore.BLUE + Style.NORMAL + "│"
-        print(crow)
-
-        if r < nrows - 1:
-            print(Fore.BLUE + "├" + ("─┼" * (ncols-1)) + "─┤")
-        else:
-            print(Fore.BLUE + "└" + ("─┴" * (ncols-1)) + "─┘" + Style.RESET_ALL)
+    top, mid, bot = row_separators(len(grid[0]))
+
+    parts = [top]
+    for row in grid:
+        parts.append("│")
+        parts.extend([CELL_GLYPHS[v] for v in row])
+        parts.append("\n")
+        parts.append(mid)
+    parts[-1] = bot
+
+    out.write("".join(parts))
 
 
 def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, TUIPlayer]) -> None:
@@ -133,10 +166,14 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, TUIPlayer])
 
     # Keep playing until there is a winner:
     while not connectm.done:
-        # Print the board
-        print()
-        print_board(connectm.grid)
-        print()
+        # Print the board (all at once, with a blank
+        # line above and below it)
+        buf = io.StringIO()
+        buf.write("\n")
+        print_board(connectm.grid, out=buf)
+        buf.write("\n")
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
         column = current.get_move()
 
@@ -144,13 +181,12 @@ def play_connect_4(connectm: ConnectMBase, players: dict[PieceColor, TUIPlayer])
         connectm.drop(column, current.color)
 
         # Update the player
-        if current.color == PieceColor.YELLOW:
-            current = players[PieceColor.RED]
-        elif current.color == PieceColor.RED:
-            current = players[PieceColor.YELLOW]
+        current = players[NEXT_COLOR[current.color]]
 
-    print()
-    print_board(connectm.grid)
+    buf = io.StringIO()
+    buf.write("\n")
+    print_board(connectm.grid, out=buf)
+    sys.stdout.write(buf.getvalue())
 
     winner = connectm.winner
     if winner is not None:
@@ -1,6 +1,6 @@
 import random
 
-from bot import RandomBot, SmartBot
+from bot import RandomBot, SmartBot, simulate_games
 from connectm import PieceColor
 from fakes import ConnectMBotFake
 
@@ -25,13 +25,13 @@ def test_random_2() -> None:
     columns, we don't get back any of those columns.
     """
     board = ConnectMBotFake(6, 7, 4)
-    bot = RandomBot(board, PieceColor.YELLOW, PieceColor.RED)
+    bot = RandomBot(board, PieceColor.YELLOW, PieceColor.RED,
+                    random.Random("test_random_2"))
 
     board._can_drop = [True, True, False, True, False, True, True]
 
     # Do this multiple times to make sure we
     # generate enough random numbers
-    random.seed("test_random_2")
     for _ in range(100):
         col = bot.suggest_move()
         assert col in (0, 1, 3, 5, 6)
@@ -43,13 +43,13 @@ def test_random_3() -> None:
     column, we only get back that column
     """
     board = ConnectMBotFake(6, 7, 4)
-    bot = RandomBot(board, PieceColor.YELLOW, PieceColor.RED)
+    bot = RandomBot(board, PieceColor.YELLOW, PieceColor.RED,
+                    random.Random("test_random_3"))
 
     board._can_drop = [False, False, False, True, False, False, False]
 
     # Do this multiple times to make sure we
     # generate enough random numbers
-    random.seed("test_random_3")
     for _ in range(100):
         col = bot.suggest_move()
         assert col == 3
@@ -94,13 +94,34 @@ def test_smart_3() -> None:
     into.
     """
     board = ConnectMBotFake(6, 7, 4)
-    bot = SmartBot(board, PieceColor.YELLOW, PieceColor.RED)
+    bot = SmartBot(board, PieceColor.YELLOW, PieceColor.RED,
+                   random.Random("test_smart_3"))
 
     board._can_drop = [True, True, False, True, False, True, True]
 
     # Do this multiple times to make sure we
     # generate enough random numbers
-    random.seed("test_smart_3")
     for _ in range(100):
         col = bot.suggest_move()
         assert col in (0, 1, 3, 5, 6)
+
+
+def test_simulate() -> None:
+    """
+    Checks that simulating games between bots produces a
+    plausible number of wins (the smart bot should win
+    most games against the random bot)
+    """
+    for player1, player2 in (("random", "random"), ("smart", "random")):
+        wins1, wins2 = simulate_games(6, 7, 4, 200, player1, player2,
+                                      seed=14200)
+
+        assert 0 <= wins1 and 0 <= wins2
+        assert wins1 + wins2 <= 200
+
+        if player1 == "smart":
+            assert wins1 > wins2
+
+        # The same seed plays out the same games
+        assert simulate_games(6, 7, 4, 200, player1, player2,
+                              seed=14200) == (wins1, wins2)
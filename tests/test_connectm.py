@@ -1,3 +1,7 @@
+import random
+
+import pytest
+
 from connectm import ConnectM, PieceColor
 
 def validate_grid(connectm: ConnectM,
@@ -97,6 +101,47 @@ def test_can_drop_2() -> None:
     
     assert not connectm.can_drop(4)
 
+def test_legal_cols() -> None:
+    """
+    Tests that the legal columns are updated as columns
+    fill up, and when the board is reset.
+    """
+    connectm = ConnectM(6, 7, 4)
+    assert connectm.legal_cols == list(range(7))
+
+    connectm = sample_board()
+    assert connectm.legal_cols == [0, 1, 2, 3]
+
+    connectm.drop(3, PieceColor.RED)
+    assert connectm.legal_cols == [0, 1, 2]
+
+    connectm.reset()
+    assert connectm.legal_cols == [0, 1, 2, 3, 4]
+
+
+def test_invalid_col() -> None:
+    """
+    Tests that invalid column indices (including negative ones)
+    are rejected, and that a rejected drop doesn't change the board.
+    """
+    # Leave a single free location in the last column
+    connectm = ConnectM(6, 7, 4)
+    for color in [PieceColor.RED, PieceColor.YELLOW] * 2 + [PieceColor.RED]:
+        connectm.drop(6, color)
+
+    for col in (-1, 7):
+        with pytest.raises(IndexError):
+            connectm.can_drop(col)
+        with pytest.raises(ValueError):
+            connectm.drop_wins(col, PieceColor.RED)
+        with pytest.raises(ValueError):
+            connectm.drop(col, PieceColor.RED)
+
+    assert connectm.legal_cols == list(range(7))
+    assert connectm.grid[0][6] is None
+    assert not connectm.done
+
+
 def test_drop_wins_1() -> None:
     """
     Tests that dropping a piece in any of the columns in an
@@ -123,6 +168,54 @@ def test_drop_wins_2() -> None:
     assert connectm.drop_wins(2, PieceColor.RED)
     assert not connectm.drop_wins(2, PieceColor.YELLOW)
 
+def test_drop_wins_3() -> None:
+    """
+    Tests that checking whether a drop results in a win
+    does not modify the board.
+    """
+    connectm = sample_board()
+    grid = connectm.grid
+
+    for i in range(5):
+        connectm.drop_wins(i, PieceColor.RED)
+        connectm.drop_wins(i, PieceColor.YELLOW)
+
+    assert connectm.grid == grid
+    assert not connectm.done
+    assert connectm.winner is None
+
+def test_winning_cols_1() -> None:
+    """
+    Tests that the only column where dropping a piece in the
+    sample board results in a win is column 2 (for red)
+    """
+    connectm = sample_board()
+
+    assert connectm.winning_cols(PieceColor.RED) == [2]
+    assert connectm.winning_cols(PieceColor.YELLOW) == []
+
+def test_winning_cols_2() -> None:
+    """
+    Tests that the winning columns agree with drop_wins
+    at every step of a series of random games (with several
+    values of M)
+    """
+    rng = random.Random("test_winning_cols_2")
+
+    for nrows, ncols, m in ((6, 7, 4), (5, 5, 3), (7, 8, 5)):
+        for _ in range(20):
+            connectm = ConnectM(nrows, ncols, m)
+            color = PieceColor.YELLOW
+            while not connectm.done:
+                for c in PieceColor:
+                    expected = [col for col in range(ncols)
+                                if connectm.can_drop(col)
+                                and connectm.drop_wins(col, c)]
+                    assert connectm.winning_cols(c) == expected
+
+                connectm.drop(rng.choice(connectm.legal_cols), color)
+                color = PieceColor(1 - color)
+
 def test_drop_1() -> None:
     """
     Tests that we can correctly drop a piece
@@ -159,6 +252,18 @@ def test_drop_3() -> None:
     validate_grid(connectm, {(5,0): PieceColor.YELLOW,
                              (4,0): PieceColor.RED})
 
+def test_iter_cells() -> None:
+    """
+    Tests that iterating over the cells produces the same
+    pieces as the grid (starting from the sample board)
+    """
+    connectm = sample_board()
+    grid = connectm.grid
+
+    cells = list(connectm.iter_cells())
+    assert len(cells) == 25
+    assert cells == [(r, c, grid[r][c]) for r in range(5) for c in range(5)]
+
 def test_reset() -> None:
     """
     Tests that we can correctly reset the board
@@ -168,6 +273,27 @@ def test_reset() -> None:
     connectm.reset()
     validate_grid(connectm, {})
 
+def test_done_full() -> None:
+    """
+    Tests that the game is done when the board is full,
+    even if there is no winner.
+    """
+    connectm = ConnectM(4, 4, 4)
+
+    # Fill the board with alternating pairs of columns,
+    # so there are no four contiguous pieces anywhere
+    for col in (0, 1, 2, 3):
+        for row in range(4):
+            if (row + col // 2) % 2 == 0:
+                color = PieceColor.RED
+            else:
+                color = PieceColor.YELLOW
+            assert not connectm.done
+            connectm.drop(col, color)
+
+    assert connectm.done
+    assert connectm.winner is None
+
 def test_win() -> None:
     """
     Tests that dropping a red piece in column 2
@@ -178,3 +304,128 @@ def test_win() -> None:
     
     assert connectm.done
     assert connectm.winner == PieceColor.RED
+
+def test_win_horizontal() -> None:
+    """
+    Tests that four pieces in a row result in a win.
+    """
+    connectm = ConnectM(6, 7, 4)
+
+    for col in range(3, 6):
+        connectm.drop(col, PieceColor.YELLOW)
+    assert not connectm.done
+
+    assert connectm.drop_wins(6, PieceColor.YELLOW)
+    assert not connectm.drop_wins(6, PieceColor.RED)
+
+    connectm.drop(6, PieceColor.YELLOW)
+    assert connectm.done
+    assert connectm.winner == PieceColor.YELLOW
+
+def test_win_vertical() -> None:
+    """
+    Tests that four pieces in a column result in a win.
+    """
+    connectm = ConnectM(6, 7, 4)
+
+    connectm.drop(0, PieceColor.YELLOW)
+    connectm.drop(0, PieceColor.YELLOW)
+    for _ in range(3):
+        connectm.drop(0, PieceColor.RED)
+    assert not connectm.done
+
+    assert connectm.drop_wins(0, PieceColor.RED)
+    assert not connectm.drop_wins(0, PieceColor.YELLOW)
+
+    connectm.drop(0, PieceColor.RED)
+    assert connectm.done
+    assert connectm.winner == PieceColor.RED
+
+def test_win_diagonal() -> None:
+    """
+    Tests that four pieces along a diagonal result in a win
+    (along both of the diagonals)
+    """
+    for cols in (range(4), range(6, 2, -1)):
+        connectm = ConnectM(6, 7, 4)
+
+        # Build a staircase of yellow pieces topped
+        # by a red piece in each column
+        for i, col in enumerate(cols):
+            for _ in range(i):
+                connectm.drop(col, PieceColor.YELLOW)
+            if i < 3:
+                connectm.drop(col, PieceColor.RED)
+        assert not connectm.done
+
+        assert connectm.drop_wins(cols[3], PieceColor.RED)
+        connectm.drop(cols[3], PieceColor.RED)
+        assert connectm.done
+        assert connectm.winner == PieceColor.RED
+
+def test_no_win_across_columns() -> None:
+    """
+    Tests that pieces at the top of one column and at the
+    bottom of the next column are not counted as contiguous.
+    """
+    connectm = ConnectM(6, 7, 4)
+
+    for color in (PieceColor.YELLOW, PieceColor.RED, PieceColor.YELLOW,
+                  PieceColor.YELLOW, PieceColor.RED, PieceColor.RED):
+        connectm.drop(0, color)
+    connectm.drop(1, PieceColor.RED)
+
+    assert not connectm.drop_wins(1, PieceColor.RED)
+    connectm.drop(1, PieceColor.RED)
+    assert not connectm.done
+    assert connectm.winner is None
+
+def test_win_m_5() -> None:
+    """
+    Tests that, with M=5, four pieces in a row do not result
+    in a win, but five do.
+    """
+    connectm = ConnectM(7, 8, 5)
+
+    for col in range(1, 5):
+        connectm.drop(col, PieceColor.RED)
+    assert not connectm.done
+
+    assert connectm.drop_wins(0, PieceColor.RED)
+    assert connectm.drop_wins(5, PieceColor.RED)
+    assert not connectm.drop_wins(6, PieceColor.RED)
+
+    connectm.drop(5, PieceColor.RED)
+    assert connectm.winner == PieceColor.RED
+
+def test_playout_1() -> None:
+    """
+    Tests that playing out a game from an empty board
+    results in a finished game, with alternating moves.
+    """
+    rng = random.Random("test_playout_1")
+    for _ in range(100):
+        connectm = ConnectM(6, 7, 4)
+        winner = connectm.playout(PieceColor.YELLOW, rng)
+
+        assert connectm.done
+        assert connectm.winner == winner
+
+        grid = connectm.grid
+        num_yellow = sum(row.count(PieceColor.YELLOW) for row in grid)
+        num_red = sum(row.count(PieceColor.RED) for row in grid)
+        assert num_yellow - num_red in (0, 1)
+
+def test_playout_2() -> None:
+    """
+    Tests that playing out a game that is already done
+    does not drop any more pieces.
+    """
+    connectm = sample_board()
+    connectm.drop(2, PieceColor.RED)
+    grid = connectm.grid
+
+    winner = connectm.playout(PieceColor.YELLOW, random.Random())
+
+    assert winner == PieceColor.RED
+    assert connectm.grid == grid